@@ -1,10 +1,17 @@
+import asyncio
+import bisect
+import functools
 import io
 import json
+import logging
 import os
 import random
 import re
 import time
-from typing import Optional, List, Tuple
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, List, Tuple, Dict
 
 from discord import (
     Client,
@@ -21,11 +28,20 @@ from discord import (
     Color,
     TextChannel,
     File,
+    NotFound,
+    HTTPException,
 )
 
 BELL = "🔔"
 THUMBSUP = "👍"
 THUMBSDOWN = "👎"
+RATINGS_FILE = "data/ratings.json"
+LEVEL_STATS_FILE = "data/level_stats.json"
+LEVEL_STATS_SAVE_DELAY = 10
+TABLE_PAGE_SIZE = 20
+SLOW_TRACE_SECONDS = 5
+TRACE_HISTORY = 100
+TRACE_DUMP_LIMIT = 8 * 1000 * 1000
 
 config: dict = json.load(open("config.json"))
 GUILD: int = config["guild"]
@@ -65,6 +81,168 @@ def category_name(category_id, category, escaped=False):
         return f"[{category_id}] {category} - Levels"
 
 
+def load_json(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        return json.load(open(path))
+    except ValueError:
+        print(f"Ignoring corrupt {path}")
+        return None
+
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as file:
+        json.dump(data, file)
+    os.replace(path + ".tmp", path)
+
+
+async def send_table(channel, title, header, rows):
+    pages = [rows[i : i + TABLE_PAGE_SIZE] for i in range(0, len(rows), TABLE_PAGE_SIZE)] or [[]]
+    for page, page_rows in enumerate(pages, 1):
+        description = "\n".join(["```", header, *page_rows, "```"])
+        if len(pages) > 1:
+            await channel.send(embed=create_embed(title=f"{title} ({page}/{len(pages)})", description=description))
+        else:
+            await channel.send(embed=create_embed(title=title, description=description))
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+class LevelStats:
+    def __init__(self):
+        self.stuck = 0
+        self.wrong_guesses = 0
+        self.solve_times: List[float] = []
+
+    def add_solve_time(self, seconds: float):
+        bisect.insort(self.solve_times, seconds)
+
+    def median_solve_time(self) -> Optional[float]:
+        count = len(self.solve_times)
+        if not count:
+            return None
+        if count % 2:
+            return self.solve_times[count // 2]
+        return (self.solve_times[count // 2 - 1] + self.solve_times[count // 2]) / 2
+
+
+class Span:
+    def __init__(self, name: str, parent: Optional["Span"] = None, bucket: Optional[str] = None):
+        self.name = name
+        self.parent = parent
+        self.bucket = bucket
+        self.start = time.time()
+        self.clock = time.monotonic()
+        self.duration = 0.0
+        self.ratelimit_wait = 0.0
+        self.lock_wait = 0.0
+        self.lock: Optional[TracedLock] = None
+        self.children: List[Span] = []
+        if parent is not None:
+            parent.children.append(self)
+
+    def finish(self):
+        self.duration = time.monotonic() - self.clock
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def rest_time(self) -> float:
+        return sum(span.duration for span in self.walk() if span.bucket is not None)
+
+    def ratelimit_time(self) -> float:
+        return sum(span.ratelimit_wait for span in self.walk())
+
+    def lock_time(self) -> float:
+        return sum(span.lock_wait for span in self.walk())
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "bucket": self.bucket,
+            "start": self.start,
+            "duration": self.duration,
+            "ratelimit_wait": self.ratelimit_wait,
+            "lock_wait": self.lock_wait,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+    def format(self, depth=0) -> List[str]:
+        line = "  " * depth + f"{self.name} {self.duration:.2f}s"
+        if self.bucket is not None:
+            line += f" [{self.bucket}]"
+        if self.ratelimit_wait or self.lock_wait:
+            line += f" (ratelimit {self.ratelimit_wait:.2f}s, lock {self.lock_wait:.2f}s)"
+        return [line] + [line for child in self.children for line in child.format(depth + 1)]
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class TracedLock(asyncio.Lock):
+    def __init__(self):
+        super().__init__()
+        self.rate_limits = deque(maxlen=16)
+
+    def hold(self, seconds: Optional[float] = None):
+        now = time.monotonic()
+        self.rate_limits.append([now, None if seconds is None else now + seconds])
+
+    def release(self):
+        now = time.monotonic()
+        for rate_limit in self.rate_limits:
+            if rate_limit[1] is None:
+                rate_limit[1] = now
+        super().release()
+
+    def rate_limited_time(self, start: float, end: float) -> float:
+        total = 0.0
+        for rate_limit_start, rate_limit_end in self.rate_limits:
+            total += max(min(end, rate_limit_end or end) - max(start, rate_limit_start), 0)
+        return min(total, end - start)
+
+    async def acquire(self):
+        start = time.monotonic()
+        try:
+            return await super().acquire()
+        finally:
+            span = current_span.get()
+            if span is not None:
+                end = time.monotonic()
+                rate_limited = self.rate_limited_time(start, end)
+                span.ratelimit_wait += rate_limited
+                span.lock_wait += end - start - rate_limited
+
+
+class RateLimitFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = current_span.get()
+        if span is not None and span.bucket is not None and record.levelno >= logging.WARNING:
+            match = re.match(r"^We are being rate limited\. Retrying in ([\d.]+) seconds", record.getMessage())
+            if match:
+                span.ratelimit_wait += float(match.group(1))
+                if span.lock is not None:
+                    span.lock.hold(float(match.group(1)))
+        return True
+
+
+def traced(func):
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        with self.trace(func.__name__):
+            return await func(self, *args, **kwargs)
+
+    return wrapper
+
+
 class Bot(Client):
     def __init__(self):
         super().__init__()
@@ -77,7 +255,62 @@ class Bot(Client):
         self.settings_message: Optional[Message] = None
 
         self.cooldowns = {}
-
+        self.level_stats: Dict[Tuple[int, int], LevelStats] = {}
+        self.level_reached: Dict[Tuple[int, int], float] = {}
+        self.level_stats_save = None
+        self.load_level_stats()
+        self.ratings: Dict[int, dict] = {}
+        self.traces = deque(maxlen=TRACE_HISTORY)
+
+        logging.getLogger("discord.http").addFilter(RateLimitFilter())
+        request = self.http.request
+
+        async def traced_request(route, *args, **kwargs):
+            with self.trace(f"{route.method} {route.path}", bucket=route.bucket) as span:
+                if not self.http._global_over.is_set():
+                    start = time.monotonic()
+                    await self.http._global_over.wait()
+                    span.ratelimit_wait += time.monotonic() - start
+                if route.bucket is not None:
+                    lock = self.http._locks.get(route.bucket)
+                    if lock is None:
+                        lock = self.http._locks[route.bucket] = TracedLock()
+                    if isinstance(lock, TracedLock):
+                        span.lock = lock
+                try:
+                    return await request(route, *args, **kwargs)
+                finally:
+                    if span.lock is not None and span.lock.locked():
+                        span.lock.hold()
+                    span.lock = None
+
+        self.http.request = traced_request
+
+    @contextmanager
+    def trace(self, name: str, bucket: Optional[str] = None):
+        span = Span(name, current_span.get(), bucket)
+        token = current_span.set(span)
+        try:
+            yield span
+        finally:
+            span.finish()
+            current_span.reset(token)
+            if span.parent is None:
+                self.finish_trace(span)
+
+    def finish_trace(self, span: Span):
+        rest_time = span.rest_time()
+        if not rest_time:
+            return
+        self.traces.append(span)
+        if rest_time > SLOW_TRACE_SECONDS:
+            print(
+                f"Slow trace: {span.name} spent {rest_time:.2f}s in REST calls "
+                f"({span.ratelimit_time():.2f}s waiting on rate limits, {span.lock_time():.2f}s on bucket locks)\n"
+                + "\n".join(span.format())
+            )
+
+    @traced
     async def on_ready(self):
         print(f"Logged in as {self.user}")
 
@@ -89,6 +322,8 @@ class Bot(Client):
         async for msg in self.settings_channel.history():
             self.settings_message: Message = msg
             break
+        self.init_level_stats()
+        await self.init_ratings()
 
     def get_levels(self, category: str) -> List[int]:
         out = []
@@ -150,6 +385,161 @@ class Bot(Client):
         )
         return category_id, name, category_channel, riddle_master_role, leaderboard_channel
 
+    def load_level_stats(self):
+        data = load_json(LEVEL_STATS_FILE)
+        if data is None:
+            return
+        for cat_id, level, wrong_guesses, solve_times in data["levels"]:
+            stats = self.get_level_stats(cat_id, level)
+            stats.wrong_guesses = wrong_guesses
+            stats.solve_times = sorted(solve_times)
+        for member_id, cat_id, reached in data["reached"]:
+            self.level_reached[(member_id, cat_id)] = reached
+
+    def save_level_stats(self):
+        if self.level_stats_save is not None:
+            self.level_stats_save.cancel()
+            self.level_stats_save = None
+        save_json(
+            LEVEL_STATS_FILE,
+            {
+                "levels": [
+                    [cat_id, level, stats.wrong_guesses, stats.solve_times]
+                    for (cat_id, level), stats in self.level_stats.items()
+                ],
+                "reached": [
+                    [member_id, cat_id, reached] for (member_id, cat_id), reached in self.level_reached.items()
+                ],
+            },
+        )
+
+    def schedule_save_level_stats(self):
+        if self.level_stats_save is None:
+            self.level_stats_save = self.loop.call_later(LEVEL_STATS_SAVE_DELAY, self.save_level_stats)
+
+    def get_member_level(self, member: Member, category: str) -> Optional[int]:
+        for role in member.roles:
+            match = re.match("^" + role_name(category, r"(\d+)") + "$", role.name)
+            if match:
+                return int(match.group(1))
+        return None
+
+    def init_level_stats(self):
+        for stats in self.level_stats.values():
+            stats.stuck = 0
+        level_reached = {}
+        for member in self.guild.members:
+            for cat_id, cat_name in self.get_categories():
+                level = self.get_member_level(member, cat_name)
+                if level is not None:
+                    self.get_level_stats(cat_id, level).stuck += 1
+                    if (member.id, cat_id) in self.level_reached:
+                        level_reached[(member.id, cat_id)] = self.level_reached[(member.id, cat_id)]
+        self.level_reached = level_reached
+        self.save_level_stats()
+
+    def get_level_stats(self, category_id: int, level_id: int) -> LevelStats:
+        return self.level_stats.setdefault((category_id, level_id), LevelStats())
+
+    def enter_level(self, member: Member, category_id: int, level_id: int):
+        self.get_level_stats(category_id, level_id).stuck += 1
+        self.level_reached[(member.id, category_id)] = time.time()
+        self.schedule_save_level_stats()
+
+    def leave_level(self, member: Member, category_id: int, level_id: int):
+        stats = self.get_level_stats(category_id, level_id)
+        stats.stuck = max(stats.stuck - 1, 0)
+        self.level_reached.pop((member.id, category_id), None)
+        self.schedule_save_level_stats()
+
+    def record_solve(self, member: Member, category_id: int, level_id: int):
+        reached = self.level_reached.get((member.id, category_id))
+        if reached is not None:
+            self.get_level_stats(category_id, level_id).add_solve_time(time.time() - reached)
+            self.save_level_stats()
+
+    def forget_level(self, role: Role, category_id: int):
+        for member in role.members:
+            self.level_reached.pop((member.id, category_id), None)
+        self.schedule_save_level_stats()
+
+    def delete_level_stats(self, category_id: int, from_level_id: int, to_level_id: int):
+        shift = to_level_id - from_level_id + 1
+        for cat_id, level in sorted(self.level_stats):
+            if cat_id != category_id or level < from_level_id:
+                continue
+            stats = self.level_stats.pop((cat_id, level))
+            if level > to_level_id:
+                self.level_stats[(cat_id, level - shift)] = stats
+        self.schedule_save_level_stats()
+
+    def load_ratings(self):
+        ratings = load_json(RATINGS_FILE) or {}
+        self.ratings.update({int(channel_id): rating for channel_id, rating in ratings.items()})
+
+    def save_ratings(self):
+        save_json(RATINGS_FILE, self.ratings)
+
+    async def find_riddle_message(self, level_channel: TextChannel) -> Optional[Message]:
+        rating = self.ratings.get(level_channel.id)
+        if rating is not None:
+            try:
+                return await level_channel.fetch_message(rating["message"])
+            except NotFound:
+                pass
+        async for msg in level_channel.history(oldest_first=True):
+            if msg.author == self.user and msg.embeds:
+                return msg
+        return None
+
+    @traced
+    async def init_ratings(self):
+        self.load_ratings()
+        stale = set(self.ratings)
+        for _, cat_name in self.get_categories():
+            for level in self.get_levels(cat_name):
+                level_channel, _, _ = self.get_level(cat_name, level)
+                if level_channel is None:
+                    continue
+                riddle_message = await self.find_riddle_message(level_channel)
+                if riddle_message is None:
+                    continue
+                rating = {"message": riddle_message.id, "up": 0, "down": 0}
+                for reaction in riddle_message.reactions:
+                    if str(reaction.emoji) == THUMBSUP:
+                        rating["up"] = reaction.count - reaction.me
+                    elif str(reaction.emoji) == THUMBSDOWN:
+                        rating["down"] = reaction.count - reaction.me
+                self.ratings[level_channel.id] = rating
+                stale.discard(level_channel.id)
+        for channel_id in stale:
+            self.ratings.pop(channel_id, None)
+        self.save_ratings()
+
+    def update_rating(self, payload, delta: int):
+        rating = self.ratings.get(payload.channel_id)
+        if rating is None or rating["message"] != payload.message_id or payload.user_id == self.user.id:
+            return
+        if str(payload.emoji) == THUMBSUP:
+            rating["up"] = max(rating["up"] + delta, 0)
+        elif str(payload.emoji) == THUMBSDOWN:
+            rating["down"] = max(rating["down"] + delta, 0)
+        else:
+            return
+        self.save_ratings()
+
+    def clear_rating(self, payload):
+        rating = self.ratings.get(payload.channel_id)
+        if rating is None or rating["message"] != payload.message_id:
+            return
+        rating["up"] = rating["down"] = 0
+        self.save_ratings()
+
+    def delete_rating(self, level_channel: TextChannel):
+        if self.ratings.pop(level_channel.id, None) is not None:
+            self.save_ratings()
+
+    @traced
     async def on_member_join(self, member: Member):
         if member.guild.id != self.guild.id:
             return
@@ -157,7 +547,7 @@ class Bot(Client):
         await member.send(open("texts/welcome_dm.txt").read().format(user=member.mention))
 
         master_of_everything = True
-        for _, cat_name in self.get_categories():
+        for cat_id, cat_name in self.get_categories():
             _, _, role = self.get_level(cat_name, 1)
             if role is not None:
                 master_of_everything = False
@@ -169,7 +559,33 @@ class Bot(Client):
         if master_of_everything:
             await member.add_roles(self.master_of_everything_role)
 
+    @traced
+    async def on_member_remove(self, member: Member):
+        if member.guild.id != self.guild.id:
+            return
+
+        for cat_id, cat_name in self.get_categories():
+            level = self.get_member_level(member, cat_name)
+            if level is not None:
+                self.leave_level(member, cat_id, level)
+
+    async def on_member_update(self, before: Member, after: Member):
+        if after.guild.id != self.guild.id or before.roles == after.roles:
+            return
+
+        for cat_id, cat_name in self.get_categories():
+            old_level = self.get_member_level(before, cat_name)
+            new_level = self.get_member_level(after, cat_name)
+            if old_level == new_level:
+                continue
+            if old_level is not None:
+                self.leave_level(after, cat_id, old_level)
+            if new_level is not None:
+                self.enter_level(after, cat_id, new_level)
+
+    @traced
     async def on_raw_reaction_add(self, payload):
+        self.update_rating(payload, 1)
         if self.settings_message is None or self.settings_message.id != payload.message_id:
             return
         if str(payload.emoji) != BELL or payload.user_id == self.user.id:
@@ -178,7 +594,9 @@ class Bot(Client):
         member: Message = self.guild.get_member(payload.user_id)
         await member.add_roles(self.notification_role)
 
+    @traced
     async def on_raw_reaction_remove(self, payload):
+        self.update_rating(payload, -1)
         if self.settings_message is None or self.settings_message.id != payload.message_id:
             return
         if str(payload.emoji) != BELL or payload.user_id == self.user.id:
@@ -187,6 +605,10 @@ class Bot(Client):
         member: Message = self.guild.get_member(payload.user_id)
         await member.remove_roles(self.notification_role)
 
+    async def on_raw_reaction_clear(self, payload):
+        self.clear_rating(payload)
+
+    @traced
     async def update_leaderboard(self, category):
         _, _, _, riddle_master_role, leaderboard_channel = self.get_category(name=category)
         async for message in leaderboard_channel.history():
@@ -219,6 +641,7 @@ class Bot(Client):
 
         await message.edit(embed=embed)
 
+    @traced
     async def update_master_of_everything_role(self, member: Member):
         master_of_everything = True
         for _, cat_name in self.get_categories():
@@ -231,12 +654,14 @@ class Bot(Client):
         else:
             await member.remove_roles(self.master_of_everything_role)
 
+    @traced
     async def on_message(self, message: Message):
         if message.author == self.user:
             return
 
         if message.content.startswith(PREFIX):
             cmd, *args = message.content[1:].split()
+            current_span.get().name = PREFIX + cmd
             if cmd == "add":
                 if not await self.is_authorized(message.author):
                     await message.channel.send("You are not authorized to use this command!")
@@ -301,6 +726,8 @@ class Bot(Client):
                             )
                         )
                     )
+                    self.ratings[level_channel.id] = {"message": riddle_message.id, "up": 0, "down": 0}
+                    self.save_ratings()
                     await riddle_message.add_reaction(THUMBSUP)
                     await riddle_message.add_reaction(THUMBSDOWN)
                     await message.channel.send("Riddle has been created! :+1:")
@@ -343,7 +770,7 @@ class Bot(Client):
                     category = args[0]
                     level_id = int(args[1])
 
-                _, cat_name, _, riddle_master_role, _ = self.get_category(category_id=category)
+                cat_id, cat_name, _, riddle_master_role, _ = self.get_category(category_id=category)
                 level_channel, _, role = self.get_level(cat_name, level_id)
                 notify_count = 0
                 for member in self.guild.members:
@@ -377,15 +804,20 @@ class Bot(Client):
                     return
 
                 category = args[1]
-                _, cat_name, category_channel, riddle_master_role, leaderboard = self.get_category(category_id=category)
+                cat_id, cat_name, category_channel, riddle_master_role, leaderboard = self.get_category(
+                    category_id=category
+                )
                 if args[0] == "category":
+                    self.delete_level_stats(cat_id, 1, self.get_max_level_id(cat_name))
                     for level in self.get_levels(cat_name):
                         level_channel, solution_channel, role = self.get_level(cat_name, level)
                         if level_channel:
                             await level_channel.delete()
+                            self.delete_rating(level_channel)
                         if solution_channel:
                             await solution_channel.delete()
                         if role:
+                            self.forget_level(role, cat_id)
                             await role.delete()
                     if leaderboard:
                         await leaderboard.delete()
@@ -414,11 +846,13 @@ class Bot(Client):
                         existed = False
                         if level_channel:
                             await level_channel.delete()
+                            self.delete_rating(level_channel)
                             existed = True
                         if solution_channel:
                             await solution_channel.delete()
                             existed = True
                         if role:
+                            self.forget_level(role, cat_id)
                             await role.delete()
                             existed = True
 
@@ -433,6 +867,7 @@ class Bot(Client):
                         await level_channel.edit(name=level_name(level - (to_level_id - from_level_id + 1)))
                         await solution_channel.edit(name=solution_name(level - (to_level_id - from_level_id + 1)))
                         await role.edit(name=role_name(cat_name, level - (to_level_id - from_level_id + 1)))
+                    self.delete_level_stats(cat_id, from_level_id, to_level_id)
                     await self.update_leaderboard(cat_name)
 
                 for member in self.guild.members:
@@ -502,17 +937,15 @@ class Bot(Client):
                 cooldown, wrong_answers = self.cooldowns.get(member.id, (0, 0))
                 seconds = round(cooldown - now)
                 if seconds > 0:
-                    minutes, seconds = divmod(seconds, 60)
-                    hours, minutes = divmod(minutes, 60)
                     await message.channel.send(
                         f"Da deine letzte Antwort falsch war, musst du noch etwas warten, "
                         f"bevor du es noch einmal versuchen kannst.\n"
-                        f"Verbleibende Zeit: `{hours:02d}:{minutes:02d}:{seconds:02d}`"
+                        f"Verbleibende Zeit: `{format_duration(seconds)}`"
                     )
                     return
 
                 answer = " ".join(args[1:])
-                _, cat_name, _, riddle_master_role, _ = self.get_category(category_id=args[0])
+                cat_id, cat_name, _, riddle_master_role, _ = self.get_category(category_id=args[0])
                 if riddle_master_role is None:
                     await message.channel.send("Tut mir leid, diese Kategorie kenne ich nicht :shrug:")
                     return
@@ -547,6 +980,7 @@ class Bot(Client):
                 async for msg in solution_channel.history():
                     if re.match(f"^{msg.content.lower()}$", answer.lower()):
                         level_channel, _, new_role = self.get_level(cat_name, level_id + 1)
+                        self.record_solve(member, cat_id, level_id)
                         await member.remove_roles(old_role)
                         if new_role is not None:
                             await member.add_roles(new_role)
@@ -572,6 +1006,8 @@ class Bot(Client):
                     await message.channel.send(f"Deine Antwort zu Level {level_id} ist leider falsch.")
                     cooldown = now + min(2 ** wrong_answers, 24 * 60 * 60)
                     wrong_answers += 1
+                    self.get_level_stats(cat_id, level_id).wrong_guesses += 1
+                    self.save_level_stats()
                 self.cooldowns[member.id] = (cooldown, wrong_answers)
                 await self.update_leaderboard(cat_name)
             elif cmd == "fix":
@@ -694,6 +1130,72 @@ class Bot(Client):
                         )
                     ).content
                     await msg_to_edit.edit(embed=create_embed(title=title, description=content))
+            elif cmd == "stats":
+                if not await self.is_authorized(message.author):
+                    await message.channel.send("You are not authorized to use this command!")
+                    return
+
+                if args == ["trace"]:
+                    dumps = []
+                    size = 2
+                    for span in reversed(self.traces):
+                        dump = json.dumps(span.to_dict())
+                        size += len(dump.encode()) + 1
+                        if size > TRACE_DUMP_LIMIT:
+                            break
+                        dumps.insert(0, dump)
+                    dump = "[" + ",".join(dumps) + "]"
+                    try:
+                        await message.channel.send(
+                            f"{len(dumps)} of {len(self.traces)} traces",
+                            file=File(io.BytesIO(dump.encode()), filename="traces.json"),
+                        )
+                    except HTTPException as e:
+                        await message.channel.send(f"Could not upload traces: {e}")
+                    return
+
+                if not (
+                    (len(args) == 2 and args[0] in ("level", "rating"))
+                    or (len(args) == 3 and args[0] == "rating" and args[2] == "sort")
+                ) or not args[1].isnumeric():
+                    await message.channel.send(
+                        f"usage: {PREFIX}stats level <category-id>\n"
+                        f"   or: {PREFIX}stats rating <category-id> [sort]\n"
+                        f"   or: {PREFIX}stats trace"
+                    )
+                    return
+
+                cat_id, cat_name, category_channel, _, _ = self.get_category(category_id=args[1])
+                if category_channel is None:
+                    await message.channel.send("Category does not exist!")
+                    return
+
+                if args[0] == "rating":
+                    table = []
+                    for level in self.get_levels(cat_name):
+                        level_channel, _, _ = self.get_level(cat_name, level)
+                        rating = level_channel and self.ratings.get(level_channel.id)
+                        if rating is not None:
+                            table.append((level, rating["up"], rating["down"]))
+                    if len(args) == 3:
+                        table.sort(key=lambda row: (row[1] - row[2], row[1]), reverse=True)
+                    rows = [
+                        str(level).ljust(5) + f"    {up:<5}    {down:<5}    {up - down:+d}" for level, up, down in table
+                    ]
+                    await send_table(
+                        message.channel, f"Ratings of {cat_name}", "LEVEL    UP       DOWN     SCORE", rows
+                    )
+                    return
+
+                rows = []
+                for level in self.get_levels(cat_name):
+                    stats = self.get_level_stats(cat_id, level)
+                    median = stats.median_solve_time()
+                    median = "-" if median is None else format_duration(median)
+                    rows.append(str(level).ljust(5) + f"    {stats.stuck:<5}    {stats.wrong_guesses:<5}    {median}")
+                await send_table(
+                    message.channel, f"Level Stats of {cat_name}", "LEVEL    STUCK    WRONG    MEDIAN", rows
+                )
             elif cmd == "help":
                 response = "```\n"
                 if await self.is_authorized(message.author):
@@ -703,6 +1205,7 @@ class Bot(Client):
             else:
                 await message.channel.send(f"Unknown command! Type `{PREFIX}help` to get a list of commands!")
 
+    @traced
     async def fix_member(self, member: Member):
         for cat_id, cat_name in self.get_categories():
             _, _, _, riddle_master_role, _ = self.get_category(category_id=cat_id)